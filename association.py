@@ -0,0 +1,164 @@
+import numpy as np
+
+
+# 类别名称关键字，按顺序匹配（withoutdog 需先于 withdog 判断）
+# 同时包含狗和绳子关键字的类别，例如 dog_leash，视为牵绳的狗
+UNLEASHED_DOG_KEYWORDS = ('withoutdog', 'no_leash', 'without_leash')
+LEASHED_DOG_KEYWORDS = ('withdog', 'with_leash')
+DOG_KEYWORDS = ('dog',)
+LEASH_KEYWORDS = ('leash', 'rope')
+PERSON_KEYWORDS = ('person', 'people', 'human', 'pedestrian')
+
+ROLE_NONE = 0
+ROLE_DOG = 1
+ROLE_LEASHED_DOG = 2
+ROLE_UNLEASHED_DOG = 3
+ROLE_LEASH = 4
+ROLE_PERSON = 5
+
+
+def class_role(class_name):
+    """
+    根据类别名称判断检测框的角色
+
+    Args:
+        class_name: 类别名称
+
+    Returns:
+        ROLE_* 常量
+    """
+    name = class_name.lower()
+    if any(key in name for key in UNLEASHED_DOG_KEYWORDS):
+        return ROLE_UNLEASHED_DOG
+    if any(key in name for key in LEASHED_DOG_KEYWORDS):
+        return ROLE_LEASHED_DOG
+    has_dog = any(key in name for key in DOG_KEYWORDS)
+    has_leash = any(key in name for key in LEASH_KEYWORDS)
+    if has_dog and has_leash:
+        return ROLE_LEASHED_DOG
+    if has_dog:
+        return ROLE_DOG
+    if has_leash:
+        return ROLE_LEASH
+    if any(key in name for key in PERSON_KEYWORDS):
+        return ROLE_PERSON
+    return ROLE_NONE
+
+
+def pairwise_iou(boxes_a, boxes_b):
+    """
+    计算两组框的IoU矩阵
+
+    Args:
+        boxes_a: (N, 4) xyxy
+        boxes_b: (M, 4) xyxy
+
+    Returns:
+        (N, M) IoU矩阵
+    """
+    a = boxes_a[:, None, :]
+    b = boxes_b[None, :, :]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return inter / np.maximum(union, 1e-9)
+
+
+def pairwise_gap(boxes_a, boxes_b):
+    """
+    计算两组框边缘之间的最短距离矩阵，相交或相接时为0
+
+    Args:
+        boxes_a: (N, 4) xyxy
+        boxes_b: (M, 4) xyxy
+
+    Returns:
+        (N, M) 距离矩阵（像素）
+    """
+    a = boxes_a[:, None, :]
+    b = boxes_b[None, :, :]
+    dx = np.clip(np.maximum(a[..., 0], b[..., 0]) - np.minimum(a[..., 2], b[..., 2]), 0, None)
+    dy = np.clip(np.maximum(a[..., 1], b[..., 1]) - np.minimum(a[..., 3], b[..., 3]), 0, None)
+    return np.hypot(dx, dy)
+
+
+def box_diagonal(boxes):
+    """框的对角线长度"""
+    return np.hypot(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1])
+
+
+def associate_leashes(dog_boxes, leash_boxes, person_boxes=None, dog_tolerance=0.2, person_tolerance=0.2):
+    """
+    将绳子分配给狗，判断每只狗是否牵绳
+
+    绳子需与狗相交或距离在狗对角线的 dog_tolerance 倍以内；画面中有人时，
+    绳子还需靠近某个人（人对角线的 person_tolerance 倍以内）。
+    每根绳子只分配给距离最近（距离相同时IoU更大）的一只狗。
+
+    Args:
+        dog_boxes: (N, 4) 狗的框
+        leash_boxes: (M, 4) 绳子的框
+        person_boxes: (K, 4) 人的框，可为空
+        dog_tolerance: 狗与绳子的距离阈值（相对狗对角线）
+        person_tolerance: 绳子与人的距离阈值（相对人对角线）
+
+    Returns:
+        (N,) 布尔数组，每只狗是否牵绳
+    """
+    dog_boxes = np.asarray(dog_boxes, dtype=np.float32).reshape(-1, 4)
+    leash_boxes = np.asarray(leash_boxes, dtype=np.float32).reshape(-1, 4)
+    leashed = np.zeros(len(dog_boxes), dtype=bool)
+    if len(dog_boxes) == 0 or len(leash_boxes) == 0:
+        return leashed
+
+    # 画面中有人时，只保留被人牵着的绳子
+    if person_boxes is not None and len(person_boxes) > 0:
+        person_boxes = np.asarray(person_boxes, dtype=np.float32).reshape(-1, 4)
+        person_gap = pairwise_gap(leash_boxes, person_boxes) / np.maximum(box_diagonal(person_boxes), 1e-9)[None, :]
+        leash_boxes = leash_boxes[(person_gap <= person_tolerance).any(axis=1)]
+        if len(leash_boxes) == 0:
+            return leashed
+
+    gap = pairwise_gap(dog_boxes, leash_boxes) / np.maximum(box_diagonal(dog_boxes), 1e-9)[:, None]
+    cost = gap - pairwise_iou(dog_boxes, leash_boxes)
+    best_dog = cost.argmin(axis=0)
+    matched = gap[best_dog, np.arange(len(leash_boxes))] <= dog_tolerance
+    leashed[best_dog[matched]] = True
+    return leashed
+
+
+def associate_detections(boxes, roles, **kwargs):
+    """
+    对一帧的全部检测框做狗-绳-人关联
+
+    自带牵绳/未牵绳语义的类别（如 withdog/withoutdog）直接采用模型判断，
+    普通的狗类别通过几何关联判断。
+
+    Args:
+        boxes: (N, 4) 检测框 xyxy
+        roles: (N,) 每个框的 ROLE_* 角色
+        **kwargs: 传给 associate_leashes 的阈值参数
+
+    Returns:
+        (dog_indices, leashed)：狗在 boxes 中的下标，以及对应的是否牵绳
+    """
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    roles = np.asarray(roles)
+
+    dog_mask = np.isin(roles, (ROLE_DOG, ROLE_LEASHED_DOG, ROLE_UNLEASHED_DOG))
+    dog_indices = np.flatnonzero(dog_mask)
+    leashed = roles[dog_indices] == ROLE_LEASHED_DOG
+
+    plain = roles[dog_indices] == ROLE_DOG
+    if plain.any():
+        leashed[plain] = associate_leashes(
+            boxes[dog_indices[plain]],
+            boxes[roles == ROLE_LEASH],
+            boxes[roles == ROLE_PERSON],
+            **kwargs
+        )
+
+    return dog_indices, leashed
@@ -6,6 +6,8 @@ import tempfile
 import os
 from ultralytics import YOLO
 
+from association import ROLE_LEASH, ROLE_LEASHED_DOG, associate_detections, class_role
+
 
 class DogLeashDetector:
     def __init__(self, model_path=None):
@@ -118,6 +120,34 @@ class DogLeashDetector:
             print(f"帧检测失败: {e}")
             return None
 
+    def detect_batch(self, sources):
+        """
+        批量检测多张图片或多个视频帧，一次predict调用完成
+
+        Args:
+            sources: 图片路径或视频帧 (numpy array) 的列表
+
+        Returns:
+            检测结果列表，与输入一一对应；失败返回 None
+        """
+        if self.model is None:
+            raise ValueError("模型未加载")
+
+        if not sources:
+            return []
+
+        try:
+            results = self.model.predict(
+                source=list(sources),
+                conf=0.25,
+                iou=0.45,
+                save=False
+            )
+            return results
+        except Exception as e:
+            print(f"批量检测失败: {e}")
+            return None
+
     def draw_detections(self, image_path, results):
         """
         在图片上绘制检测框并保存结果
@@ -183,44 +213,54 @@ class DogLeashDetector:
             results: 检测结果
 
         Returns:
-            检测信息字典
+            检测信息字典。leash_detected 表示画面中检测到绳子（或牵绳的狗），
+            dogs 为每只狗的牵绳判断，leashed_dog_count/unleashed_dog_count 为对应数量
         """
-        if not results or len(results) == 0:
-            return {"detections": []}
-
-        result = results[0]
         detection_info = {
             "detections": [],
+            "dogs": [],
             "leash_detected": False,
-            "dog_detected": False
+            "dog_detected": False,
+            "leashed_dog_count": 0,
+            "unleashed_dog_count": 0
         }
 
-        if hasattr(result, 'boxes') and result.boxes is not None:
-            boxes = result.boxes
-            for i in range(len(boxes)):
-                class_id = int(boxes.cls[i])
-                class_name = result.names[class_id]
-                confidence = float(boxes.conf[i])
+        if not results or len(results) == 0:
+            return detection_info
+
+        result = results[0]
 
+        if hasattr(result, 'boxes') and result.boxes is not None and len(result.boxes) > 0:
+            boxes = result.boxes
+            xyxy = boxes.xyxy.cpu().numpy()
+            class_ids = boxes.cls.cpu().numpy().astype(int)
+            confidences = boxes.conf.cpu().numpy()
+
+            roles = []
+            for box, class_id, confidence in zip(xyxy, class_ids, confidences):
+                class_name = result.names[int(class_id)]
+                roles.append(class_role(class_name))
                 detection_info["detections"].append({
                     "class_name": class_name,
-                    "confidence": confidence,
-                    "class_id": class_id
+                    "confidence": float(confidence),
+                    "class_id": int(class_id),
+                    "box": [float(v) for v in box]
+                })
+
+            # 狗-绳-人几何关联，得到每只狗的牵绳状态
+            dog_indices, leashed = associate_detections(xyxy, roles)
+            for index, is_leashed in zip(dog_indices, leashed):
+                detection = detection_info["detections"][index]
+                detection_info["dogs"].append({
+                    "class_name": detection["class_name"],
+                    "confidence": detection["confidence"],
+                    "box": detection["box"],
+                    "leashed": bool(is_leashed)
                 })
 
-                # 根据你的实际类别名称进行判断
-                class_name_lower = class_name.lower()
-
-                # 假设你的类别是：withdog(牵绳狗), withoutdog(未牵绳狗), leash(绳子)等
-                if 'withdog' in class_name_lower or 'leash' in class_name_lower or 'with_leash' in class_name_lower:
-                    detection_info["leash_detected"] = True
-                    detection_info["dog_detected"] = True
-                elif 'withoutdog' in class_name_lower or 'no_leash' in class_name_lower:
-                    detection_info["dog_detected"] = True
-                    # leash_detected 保持 False
-                elif 'dog' in class_name_lower and 'leash' not in class_name_lower:
-                    detection_info["dog_detected"] = True
-                elif 'leash' in class_name_lower or 'rope' in class_name_lower:
-                    detection_info["leash_detected"] = True
-
-        return detection_info
\ No newline at end of file
+            detection_info["dog_detected"] = len(dog_indices) > 0
+            detection_info["leash_detected"] = any(role in (ROLE_LEASH, ROLE_LEASHED_DOG) for role in roles)
+            detection_info["leashed_dog_count"] = int(leashed.sum())
+            detection_info["unleashed_dog_count"] = int((~leashed).sum())
+
+        return detection_info
@@ -0,0 +1,333 @@
+import multiprocessing as mp
+import queue
+import time
+import weakref
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+
+class SharedFramePool:
+    def __init__(self, num_slots, frame_shape, dtype=np.uint8, ctx=None, poll_interval=0.1):
+        """
+        基于共享内存的帧池，用于解码进程与推理进程之间零拷贝传递视频帧
+
+        解码端通过 acquire/write/publish（或 put）把帧写入固定槽位，
+        推理端通过 get 按槽位索引直接读取共享内存视图，用完后 release 归还槽位。
+        空闲槽位耗尽时 acquire 会阻塞，从而对解码端形成背压，
+        推理端暂停读取时解码端也随之暂停。
+        调用 stop 后，所有等待中的 acquire/put 会在 poll_interval 内返回。
+
+        Args:
+            num_slots: 槽位数量
+            frame_shape: 帧形状 (h, w, c)
+            dtype: 帧数据类型
+            ctx: multiprocessing 上下文，默认使用当前默认上下文
+            poll_interval: 阻塞等待时检查停止信号的间隔（秒）
+        """
+        if num_slots <= 0:
+            raise ValueError("槽位数量必须大于0")
+
+        ctx = ctx or mp.get_context()
+        self.num_slots = num_slots
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.frame_nbytes = int(np.prod(self.frame_shape)) * self.dtype.itemsize
+        self.poll_interval = poll_interval
+
+        self.shm = shared_memory.SharedMemory(create=True, size=self.frame_nbytes * num_slots)
+        self.owner = True
+
+        # 空闲槽位队列（解码端取），就绪槽位队列（推理端取）
+        self.free_slots = ctx.Queue(maxsize=num_slots)
+        self.ready_slots = ctx.Queue(maxsize=num_slots + 1)
+        for slot in range(num_slots):
+            self.free_slots.put(slot)
+
+        # 停止信号，消费端不再读取时用于唤醒阻塞中的解码端
+        self.stop_event = ctx.Event()
+        # 控制命令队列，目前只有跳转到指定帧（seek）
+        self.commands = ctx.Queue()
+
+        self._frames = None
+
+    @classmethod
+    def for_video(cls, video_path, num_slots=8, ctx=None):
+        """
+        根据视频的分辨率创建帧池
+
+        Args:
+            video_path: 视频路径
+            num_slots: 槽位数量
+            ctx: multiprocessing 上下文
+
+        Returns:
+            (SharedFramePool 实例, 视频第一帧)
+        """
+        capture = cv2.VideoCapture(video_path)
+        try:
+            ret, frame = capture.read()
+            if not ret:
+                raise ValueError(f"无法读取视频帧: {video_path}")
+            return cls(num_slots, frame.shape, frame.dtype, ctx=ctx), frame
+        finally:
+            capture.release()
+
+    def __getstate__(self):
+        # 传给子进程时只传共享内存名称和队列，numpy 视图在子进程中重新建立
+        state = self.__dict__.copy()
+        state["_frames"] = None
+        state["owner"] = False
+        return state
+
+    @property
+    def frames(self):
+        """所有槽位的共享内存视图，形状为 (num_slots, h, w, c)"""
+        if self._frames is None:
+            self._frames = np.ndarray((self.num_slots,) + self.frame_shape,
+                                      dtype=self.dtype, buffer=self.shm.buf)
+        return self._frames
+
+    @property
+    def stopped(self):
+        """是否已发出停止信号"""
+        return self.stop_event.is_set()
+
+    def stop(self):
+        """发出停止信号，解码端在下一次等待槽位时退出"""
+        self.stop_event.set()
+
+    def seek(self, frame_index):
+        """
+        让已读到结尾的解码端从指定帧重新开始解码
+
+        Args:
+            frame_index: 帧序号
+        """
+        self.commands.put(frame_index)
+
+    def wait_seek(self):
+        """
+        解码端等待 seek 命令，收到停止信号时返回 None
+
+        Returns:
+            帧序号或 None
+        """
+        while not self.stopped:
+            try:
+                return self.commands.get(timeout=self.poll_interval)
+            except queue.Empty:
+                continue
+        return None
+
+    def acquire(self, timeout=None):
+        """
+        获取一个空闲槽位，没有空闲槽位时阻塞，收到停止信号后立即返回
+
+        Args:
+            timeout: 超时时间（秒），None 表示一直等待到有空闲槽位或停止
+
+        Returns:
+            槽位索引，超时或已停止返回 None
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.stopped:
+            wait = self.poll_interval
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    return None
+            try:
+                return self.free_slots.get(timeout=wait)
+            except queue.Empty:
+                continue
+        return None
+
+    def write(self, slot, frame):
+        """将帧拷贝到指定槽位"""
+        if frame.shape != self.frame_shape:
+            raise ValueError(f"帧形状不匹配: {frame.shape}，帧池要求 {self.frame_shape}")
+        np.copyto(self.frames[slot], frame, casting="unsafe")
+
+    def publish(self, slot, meta=None):
+        """将写好的槽位交给推理端"""
+        self.ready_slots.put((slot, meta))
+
+    def put(self, frame, meta=None, timeout=None):
+        """
+        写入一帧（acquire + write + publish）
+
+        Args:
+            frame: 视频帧 (numpy array)
+            meta: 附带信息，例如帧序号
+            timeout: 等待空闲槽位的超时时间
+
+        Returns:
+            是否写入成功，超时或已停止返回 False
+        """
+        slot = self.acquire(timeout=timeout)
+        if slot is None:
+            return False
+        try:
+            self.write(slot, frame)
+        except Exception:
+            self.release(slot)
+            raise
+        self.publish(slot, meta)
+        return True
+
+    def get(self, timeout=None, producer=None):
+        """
+        读取一帧，返回的帧是共享内存的只读视图，使用完毕后必须调用 release
+
+        视图在 release 后可能被解码端覆盖，close 后不可再访问；
+        需要在 release 之后继续使用（例如交给会缓存输入的模型）时先 copy。
+
+        Args:
+            timeout: 超时时间（秒），None 表示一直等待
+            producer: 解码进程，传入时每次等待间隔检查其是否存活，
+                      进程异常退出（未发送结束标记）时按结束处理
+
+        Returns:
+            (slot, frame, meta)；超时返回 None；解码端结束时返回 (None, None, None)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.poll_interval
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    return None
+            try:
+                item = self.ready_slots.get(timeout=wait)
+                break
+            except queue.Empty:
+                if producer is not None and not producer.is_alive():
+                    # 进程退出前写入的帧可能仍在队列中，最后再取一次
+                    try:
+                        item = self.ready_slots.get(timeout=self.poll_interval)
+                        break
+                    except queue.Empty:
+                        return None, None, None
+
+        if item is None:
+            return None, None, None
+
+        slot, meta = item
+        frame = self.frames[slot]
+        frame.flags.writeable = False
+        return slot, frame, meta
+
+    def release(self, slot):
+        """归还槽位供解码端复用"""
+        self.free_slots.put(slot)
+
+    def close_stream(self):
+        """通知推理端没有更多帧"""
+        self.ready_slots.put(None)
+
+    def close(self):
+        """
+        断开当前进程与共享内存的连接
+
+        仍有 get 返回的视图存活时抛出 BufferError 且不解除映射，
+        避免之后访问这些视图时读取已释放的内存。
+        """
+        if self._frames is not None:
+            # 所有槽位视图都引用同一个底层数组，它还存活说明有视图未释放
+            frames_ref = weakref.ref(self._frames)
+            self._frames = None
+            if frames_ref() is not None:
+                self._frames = frames_ref()
+                raise BufferError("帧池中仍有未释放的帧视图，无法关闭共享内存")
+        self.shm.close()
+
+    def unlink(self):
+        """释放共享内存（仅创建者调用）"""
+        if self.owner:
+            self.shm.unlink()
+
+
+def decode_video_to_pool(video_path, pool, max_frames=None, start_frame=0):
+    """
+    解码进程入口：读取视频并写入帧池，帧池收到停止信号时退出
+
+    推理端暂停读取时，解码端在槽位用完后阻塞，即随之暂停；
+    读到结尾后发送结束标记，并等待 seek 命令从指定帧重新开始。
+
+    Args:
+        video_path: 视频路径
+        pool: SharedFramePool 实例
+        max_frames: 每次从起始帧开始最多解码的帧数，None 表示解码到视频结束
+        start_frame: 起始帧序号
+    """
+    capture = cv2.VideoCapture(video_path)
+    if start_frame:
+        capture.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+    frame_index = start_frame
+    try:
+        while True:
+            start_frame = frame_index
+
+            while not pool.stopped and (max_frames is None or frame_index - start_frame < max_frames):
+                ret, frame = capture.read()
+                if not ret:
+                    break
+                if not pool.put(frame, meta=frame_index):
+                    break
+                frame_index += 1
+
+            if pool.stopped:
+                break
+            pool.close_stream()
+            frame_index = pool.wait_seek()
+            if frame_index is None:
+                break
+            capture.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+    except Exception as e:
+        print(f"视频解码失败: {e}")
+        pool.close_stream()
+    finally:
+        capture.release()
+        pool.close()
+
+
+def start_decoder(video_path, pool, max_frames=None, start_frame=0, ctx=None):
+    """
+    启动独立的解码进程
+
+    Args:
+        video_path: 视频路径
+        pool: SharedFramePool 实例
+        max_frames: 最多解码的帧数
+        start_frame: 起始帧序号
+        ctx: multiprocessing 上下文
+
+    Returns:
+        已启动的 Process
+    """
+    ctx = ctx or mp.get_context()
+    process = ctx.Process(target=decode_video_to_pool,
+                          args=(video_path, pool, max_frames, start_frame), daemon=True)
+    process.start()
+    return process
+
+
+def stop_decoder(process, pool, timeout=2.0):
+    """
+    停止解码进程
+
+    强制结束的进程可能在写队列时被打断，使帧池的队列损坏，
+    因此停止后帧池不再复用，应 close/unlink 后重新创建。
+
+    Args:
+        process: start_decoder 返回的 Process
+        pool: SharedFramePool 实例
+        timeout: 等待进程退出的时间，超时后强制结束
+    """
+    pool.stop()
+    process.join(timeout=timeout)
+    if process.is_alive():
+        process.terminate()
+        process.join()
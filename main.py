@@ -1,12 +1,15 @@
 import sys
 import os
+import time
+from collections import deque
 import cv2
 from PyQt5.QtWidgets import QApplication, QMainWindow, QMessageBox
 from PyQt5.QtCore import QTimer, Qt
 from PyQt5.QtGui import QImage, QPixmap
-import torch
 from ui import MainUI
-from detector import DogLeashDetector
+from multi_stream import MultiStreamProcessor
+from frame_pool import SharedFramePool, start_decoder, stop_decoder
+from watch_folder import FolderWatcher
 
 
 class MainWindow(QMainWindow):
@@ -16,6 +19,8 @@ class MainWindow(QMainWindow):
         self.ui.setupUi(self)
 
         # 初始化检测器
+        # 在这里导入，避免解码子进程（Windows 下以 spawn 方式启动会重新导入本模块）加载 torch/ultralytics
+        from detector import DogLeashDetector
         self.detector = DogLeashDetector()
 
         # 连接信号和槽
@@ -23,18 +28,37 @@ class MainWindow(QMainWindow):
 
         # 当前检测状态
         self.is_detecting = False
-        self.video_capture = None
+        # 视频在独立的解码进程中读取，通过共享内存帧池传给检测
+        self.frame_pool = None
+        self.decoder_process = None
+        self.video_ended = False
+        self.multi_stream = None
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_video_frame)
 
         # 视频检测结果统计
         self.video_results = []
 
+        # 文件夹监控
+        self.folder_watcher = None
+        self.watch_timer = QTimer()
+        self.watch_timer.timeout.connect(self.poll_watch_folder)
+
+        # 检测记录和状态先进入队列，由定时器按固定节奏刷新到界面
+        self.log_queue = deque(maxlen=self.ui.log_model.max_rows)
+        self.pending_status = None
+        self.log_timer = QTimer()
+        self.log_timer.timeout.connect(self.flush_log)
+        self.log_timer.start(200)
+
     def connect_signals(self):
         """连接UI信号和槽函数"""
         self.ui.btn_select_image.clicked.connect(self.select_image)
         self.ui.btn_select_video.clicked.connect(self.select_video)
+        self.ui.btn_select_multi_video.clicked.connect(self.select_multi_video)
+        self.ui.btn_watch_folder.clicked.connect(self.toggle_watch_folder)
         self.ui.btn_start_detection.clicked.connect(self.toggle_detection)
+        self.ui.btn_clear_history.clicked.connect(self.clear_history)
 
     def select_image(self):
         """选择图片文件"""
@@ -60,6 +84,72 @@ class MainWindow(QMainWindow):
         if file_path:
             self.process_video(file_path)
 
+    def select_multi_video(self):
+        """选择多个视频文件，作为多路摄像头同时检测"""
+        from PyQt5.QtWidgets import QFileDialog
+
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self, "选择多个视频", "",
+            "Video Files (*.mp4 *.avi *.mov *.mkv)"
+        )
+
+        if file_paths:
+            self.process_multi_video(file_paths)
+
+    def toggle_watch_folder(self):
+        """开始/停止监控文件夹"""
+        from PyQt5.QtWidgets import QFileDialog
+
+        if self.folder_watcher:
+            self.watch_timer.stop()
+            self.folder_watcher = None
+            self.ui.btn_watch_folder.setText("📂 监控文件夹")
+            self.set_status("已停止监控文件夹")
+            return
+
+        folder = QFileDialog.getExistingDirectory(self, "选择监控文件夹", "")
+        if not folder:
+            return
+
+        try:
+            self.folder_watcher = FolderWatcher(self.detector, folder)
+            self.ui.btn_watch_folder.setText("⏹️ 停止监控")
+            self.set_status(f"正在监控: {folder}")
+            self.watch_timer.start(2000)  # 每2秒扫描一次
+            self.poll_watch_folder()
+        except Exception as e:
+            self.folder_watcher = None
+            QMessageBox.critical(self, "错误", f"文件夹监控启动失败: {str(e)}")
+
+    def poll_watch_folder(self):
+        """检测监控文件夹中新增或修改的图片"""
+        if not self.folder_watcher:
+            return
+
+        try:
+            processed = self.folder_watcher.poll()
+        except Exception as e:
+            self.set_status(f"文件夹扫描失败: {str(e)}")
+            return
+
+        # 还有积压的文件时尽快继续处理，每次只处理一批，界面保持响应
+        if self.folder_watcher.pending_count:
+            QTimer.singleShot(0, self.poll_watch_folder)
+
+        if not processed:
+            return
+
+        for image_path, results, detection_info in processed:
+            analysis = self.analyze_detection_results(results)
+            self.display_detection_result(f"{os.path.basename(image_path)}: {analysis}")
+
+        # 显示本批最后一张图片
+        image_path, results, _ = processed[-1]
+        self.display_image(image_path, self.ui.label_original)
+        self.display_result_image(self.detector.draw_detections(image_path, results))
+        self.set_status(f"监控中... 本次处理 {len(processed)} 张图片，"
+                        f"剩余 {self.folder_watcher.pending_count} 张")
+
     def process_image(self, image_path):
         """处理图片检测"""
         try:
@@ -88,26 +178,84 @@ class MainWindow(QMainWindow):
     def process_video(self, video_path):
         """处理视频文件"""
         try:
+            self.reset_video_sources()
             self.video_path = video_path
-            self.video_capture = cv2.VideoCapture(video_path)
             self.video_results = []
 
-            # 显示第一帧
-            ret, frame = self.video_capture.read()
-            if ret:
-                self.display_cv_image(frame, self.ui.label_original)
+            # 按视频分辨率创建帧池，并显示第一帧
+            self.frame_pool, frame = SharedFramePool.for_video(video_path)
+            self.display_cv_image(frame, self.ui.label_original)
+
+            # 解码进程在整个视频会话中保持运行，停止检测时靠帧池背压暂停
+            self.decoder_process = start_decoder(video_path, self.frame_pool)
+            self.video_ended = False
 
             self.ui.btn_start_detection.setEnabled(True)
-            self.ui.label_status.setText("准备开始视频检测")
+            self.set_status("准备开始视频检测")
 
         except Exception as e:
             QMessageBox.critical(self, "错误", f"视频加载失败: {str(e)}")
 
+    def process_multi_video(self, video_paths):
+        """处理多路视频，所有视频源共用一个检测器"""
+        try:
+            self.reset_video_sources()
+
+            failed = MultiStreamProcessor.check_sources(video_paths)
+            if failed:
+                QMessageBox.warning(self, "警告", "以下视频源无法打开，已跳过:\n" + "\n".join(failed))
+                video_paths = [path for path in video_paths if path not in failed]
+                if not video_paths:
+                    return
+
+            # 循环播放视频文件，模拟持续输入的摄像头
+            self.multi_stream = MultiStreamProcessor(self.detector, video_paths, loop=True)
+
+            self.ui.btn_start_detection.setEnabled(True)
+            self.set_status(f"已加载 {len(video_paths)} 路视频，准备开始检测")
+
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"多路视频加载失败: {str(e)}")
+
+    def reset_video_sources(self):
+        """停止当前检测并释放已加载的视频源"""
+        if self.is_detecting:
+            self.toggle_detection()
+        if self.decoder_process:
+            stop_decoder(self.decoder_process, self.frame_pool)
+            self.decoder_process = None
+        if self.frame_pool:
+            try:
+                self.frame_pool.close()
+            except BufferError as e:
+                # 仍有视图引用共享内存时保留映射，进程退出时由系统回收
+                print(f"共享内存关闭失败: {e}")
+            self.frame_pool.unlink()
+            self.frame_pool = None
+        if self.multi_stream:
+            self.multi_stream.stop()
+            self.multi_stream = None
+
     def toggle_detection(self):
         """开始/停止视频检测"""
         if not self.is_detecting:
             # 开始检测
-            if self.video_capture:
+            if self.multi_stream:
+                try:
+                    self.multi_stream.start()
+                except RuntimeError as e:
+                    self.multi_stream.stop()
+                    QMessageBox.warning(self, "警告", f"多路视频启动失败: {str(e)}")
+                    return
+            elif self.frame_pool:
+                if not self.decoder_process or not self.decoder_process.is_alive():
+                    # 解码进程异常退出，重新加载视频
+                    self.process_video(self.video_path)
+                elif self.video_ended:
+                    # 视频已播放完，从头开始
+                    self.frame_pool.seek(0)
+                self.video_ended = False
+            if self.frame_pool or self.multi_stream:
                 self.is_detecting = True
                 self.ui.btn_start_detection.setText("停止检测")
                 self.timer.start(30)  # 30ms更新一帧
@@ -119,15 +267,29 @@ class MainWindow(QMainWindow):
             self.timer.stop()
 
             # 显示最终统计结果
-            if self.video_results:
+            if self.multi_stream:
+                self.multi_stream.stop()
+                self.display_detection_result(self.get_multi_stream_result())
+            elif self.video_results:
                 final_result = self.get_final_video_result()
                 self.display_detection_result(final_result)
 
     def update_video_frame(self):
         """更新视频帧"""
-        if self.video_capture and self.is_detecting:
-            ret, frame = self.video_capture.read()
-            if ret:
+        if self.multi_stream and self.is_detecting:
+            self.update_multi_stream_frame()
+        elif self.decoder_process and self.is_detecting:
+            item = self.frame_pool.get(timeout=0.005, producer=self.decoder_process)
+            if item is None:
+                # 解码进程还没有准备好下一帧
+                return
+
+            slot, frame, _ = item
+            if slot is not None:
+                # 复制后立即归还槽位：模型会缓存输入帧，不能持有共享内存的视图
+                frame = frame.copy()
+                self.frame_pool.release(slot)
+
                 # 显示原帧
                 self.display_cv_image(frame, self.ui.label_original)
 
@@ -145,16 +307,41 @@ class MainWindow(QMainWindow):
 
                     # 更新状态
                     current_status = self.analyze_detection_results(results)
-                    self.ui.label_status.setText(f"检测中... 当前状态: {current_status.split(chr(10))[0]}")
+                    self.set_status(f"检测中... 当前状态: {current_status.split(chr(10))[0]}")
                 else:
                     self.display_cv_image(frame, self.ui.label_result)
                     # 记录空结果
-                    self.video_results.append({"detections": [], "leash_detected": False, "dog_detected": False})
-                    self.ui.label_status.setText("检测中... 未发现目标")
+                    self.video_results.append(self.detector.get_detection_info(None))
+                    self.set_status("检测中... 未发现目标")
             else:
                 # 视频结束
+                self.video_ended = True
                 self.toggle_detection()
 
+    def update_multi_stream_frame(self):
+        """调度并检测一批多路视频帧，刷新网格画面"""
+        outputs = self.multi_stream.step()
+
+        if outputs:
+            self.display_cv_image(self.multi_stream.grid_image(original=True), self.ui.label_original)
+            self.display_cv_image(self.multi_stream.grid_image(), self.ui.label_result)
+
+            status_lines = []
+            for stream_id, stats in enumerate(self.multi_stream.stats):
+                error = self.multi_stream.streams[stream_id].error
+                if error:
+                    status_lines.append(f"#{stream_id + 1}: {error}")
+                    continue
+                status_lines.append(
+                    f"#{stream_id + 1}: {stats['frames_processed']}帧 "
+                    f"{self.multi_stream.stream_fps(stream_id):.1f}fps "
+                    f"狗{stats['frames_with_dog']} 牵绳{stats['frames_with_leash']}"
+                )
+            self.set_status("多路检测中...\n" + "\n".join(status_lines))
+        elif self.multi_stream.finished:
+            # 所有视频源结束
+            self.toggle_detection()
+
     def analyze_detection_results(self, results):
         """分析检测结果"""
         if not results or len(results) == 0:
@@ -169,18 +356,14 @@ class MainWindow(QMainWindow):
         for det in detections:
             detection_text += f"{det['class_name']}({det['confidence']:.2f}) "
 
-        dog_detected = detection_info["dog_detected"]
-        leash_detected = detection_info["leash_detected"]
-
-        # 根据你的实际类别进行判断
-        class_names = [det['class_name'].lower() for det in detections]
+        # 按每只狗的牵绳状态判断，有任意一只未牵绳即为不文明
+        dogs = detection_info["dogs"]
+        unleashed_count = sum(1 for dog in dogs if not dog["leashed"])
 
-        if any('withdog' in name for name in class_names) or (dog_detected and leash_detected):
-            return "文明遛狗：已牵绳\n" + detection_text
-        elif any('withoutdog' in name for name in class_names) or (dog_detected and not leash_detected):
-            return "不文明遛狗：未牵绳\n" + detection_text
-        elif dog_detected:
-            return "检测到狗狗但无法确定是否牵绳\n" + detection_text
+        if unleashed_count:
+            return f"不文明遛狗：未牵绳 ({unleashed_count}/{len(dogs)}只)\n" + detection_text
+        elif dogs:
+            return f"文明遛狗：已牵绳 ({len(dogs)}只)\n" + detection_text
         else:
             return "未检测到狗狗\n" + detection_text
 
@@ -213,10 +396,10 @@ class MainWindow(QMainWindow):
 
             # 分类当前帧的结果
             if result["dog_detected"]:
-                if result["leash_detected"]:
-                    result_categories.append("文明遛狗：已牵绳")
-                else:
+                if result["unleashed_dog_count"]:
                     result_categories.append("不文明遛狗：未牵绳")
+                else:
+                    result_categories.append("文明遛狗：已牵绳")
             else:
                 result_categories.append("未检测到狗狗")
 
@@ -246,6 +429,25 @@ class MainWindow(QMainWindow):
 
         return result_text
 
+    def get_multi_stream_result(self):
+        """获取多路视频的分路统计结果"""
+        result_text = f"多路视频检测完成！共 {len(self.multi_stream.stats)} 路\n\n"
+
+        for stream_id, stats in enumerate(self.multi_stream.stats):
+            stream = self.multi_stream.streams[stream_id]
+            result_text += f"#{stream_id + 1} {os.path.basename(stats['source'])}\n"
+            if stream.error:
+                result_text += f"  错误: {stream.error}\n"
+            result_text += f"  已检测帧数: {stats['frames_processed']} (丢弃 {stream.frames_dropped})\n"
+            result_text += f"  平均帧率: {self.multi_stream.stream_fps(stream_id):.1f} fps\n"
+            result_text += f"  检测到狗狗的帧数: {stats['frames_with_dog']}\n"
+            result_text += f"  检测到牵绳的帧数: {stats['frames_with_leash']}\n"
+            for class_name, count in stats["class_count"].items():
+                result_text += f"  {class_name}: {count}次\n"
+            result_text += "\n"
+
+        return result_text
+
     def display_image(self, image_path, label):
         """显示图片到QLabel"""
         pixmap = QPixmap(image_path)
@@ -269,11 +471,42 @@ class MainWindow(QMainWindow):
         self.display_image(image_path, self.ui.label_result)
 
     def display_detection_result(self, result_text):
-        """显示检测结果文本"""
-        # 确保在主线程中更新UI
-        self.ui.text_result.setPlainText(result_text)
-        # 强制刷新UI
-        self.ui.text_result.repaint()
+        """添加检测结果到记录队列"""
+        self.log_queue.append(f"[{time.strftime('%H:%M:%S')}]")
+        self.log_queue.extend(result_text.rstrip("\n").split("\n"))
+
+    def closeEvent(self, event):
+        """关闭窗口时停止解码进程并释放共享内存"""
+        self.reset_video_sources()
+        super().closeEvent(event)
+
+    def set_status(self, status_text):
+        """更新状态文本，实际显示在下一次刷新时进行"""
+        self.pending_status = status_text
+
+    def flush_log(self):
+        """将队列中的记录和最新状态刷新到界面"""
+        if self.log_queue:
+            scroll_bar = self.ui.log_view.verticalScrollBar()
+            at_bottom = scroll_bar.value() == scroll_bar.maximum()
+
+            lines = list(self.log_queue)
+            self.log_queue.clear()
+            self.ui.log_model.append_lines(lines)
+
+            # 只有在查看最新记录时才自动滚动，方便向上翻看历史
+            if at_bottom:
+                self.ui.log_view.scrollToBottom()
+
+        if self.pending_status is not None:
+            if self.pending_status != self.ui.label_status.text():
+                self.ui.label_status.setText(self.pending_status)
+            self.pending_status = None
+
+    def clear_history(self):
+        """清空检测记录"""
+        self.log_queue.clear()
+        self.ui.log_model.clear()
 
 
 def main():
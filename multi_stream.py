@@ -0,0 +1,285 @@
+import math
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class VideoStream:
+    def __init__(self, stream_id, source, loop=True, queue_size=2):
+        """
+        单路视频源，在后台线程中持续读取帧
+
+        Args:
+            stream_id: 视频源编号
+            source: 视频文件路径或视频流地址
+            loop: 读到结尾后是否从头循环（用视频文件模拟摄像头时使用）
+            queue_size: 缓存帧数，队列满时丢弃最旧的帧
+        """
+        self.stream_id = stream_id
+        self.source = source
+        self.loop = loop
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.finished = False
+        self.error = None
+        self.frames_read = 0
+        self.frames_dropped = 0
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """启动读取线程，上一次的读取线程仍未退出时抛出 RuntimeError"""
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            if self._thread.is_alive():
+                raise RuntimeError(f"视频源 {self.stream_id + 1} 的读取线程仍未退出: {self.source}")
+            self._thread = None
+
+        self._stop_event.clear()
+        self.finished = False
+        self.error = None
+        self._thread = threading.Thread(target=self._read_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止读取线程，读取阻塞（如网络流）时线程会在读取返回后退出"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            if not self._thread.is_alive():
+                self._thread = None
+
+    def read(self):
+        """非阻塞地取出一帧，没有可用帧时返回 None"""
+        try:
+            return self.frames.get_nowait()
+        except queue.Empty:
+            return None
+
+    @property
+    def exhausted(self):
+        """读取已结束且缓存已取空"""
+        return self.finished and self.frames.empty()
+
+    def _read_loop(self):
+        capture = cv2.VideoCapture(self.source)
+        if not capture.isOpened():
+            self.error = "无法打开视频源"
+            print(f"视频源 {self.stream_id + 1} 打开失败: {self.source}")
+            capture.release()
+            self.finished = True
+            return
+
+        # 按视频自身帧率读取，避免视频文件被解码得比实时更快
+        fps = capture.get(cv2.CAP_PROP_FPS)
+        interval = 1.0 / fps if 0 < fps <= 120 else 0.0
+        next_time = time.time()
+        try:
+            while not self._stop_event.is_set():
+                if interval:
+                    delay = next_time - time.time()
+                    if delay > 0:
+                        self._stop_event.wait(delay)
+                    next_time = max(next_time + interval, time.time() - interval)
+                ret, frame = capture.read()
+                if not ret:
+                    if not self.loop:
+                        break
+                    # 视频文件回到开头，视频流则重新连接
+                    if not capture.set(cv2.CAP_PROP_POS_FRAMES, 0):
+                        capture.release()
+                        capture = cv2.VideoCapture(self.source)
+                    ret, frame = capture.read()
+                    if not ret:
+                        break
+
+                self.frames_read += 1
+                # 保留最新的帧，来不及处理的旧帧直接丢弃
+                while True:
+                    try:
+                        self.frames.put_nowait(frame)
+                        break
+                    except queue.Full:
+                        try:
+                            self.frames.get_nowait()
+                            self.frames_dropped += 1
+                        except queue.Empty:
+                            pass
+        except Exception as e:
+            self.error = str(e)
+            print(f"视频源 {self.stream_id + 1} 读取失败: {e}")
+        finally:
+            capture.release()
+            self.finished = True
+
+
+class MultiStreamProcessor:
+    def __init__(self, detector, sources, loop=True, max_batch=None):
+        """
+        多路视频并发检测，所有视频源共用一个检测器
+
+        每次 step 按轮询顺序从各路取帧，合并为一个批次送入检测器，
+        起始视频源每次轮换，保证各路被公平调度。
+
+        Args:
+            detector: DogLeashDetector 实例
+            sources: 视频文件路径或视频流地址列表
+            loop: 视频结束后是否循环播放
+            max_batch: 每批最多帧数，None 表示每路最多一帧
+        """
+        self.detector = detector
+        self.streams = [VideoStream(i, source, loop=loop) for i, source in enumerate(sources)]
+        self.max_batch = max_batch or len(self.streams)
+        self.stats = [self._empty_stats(stream) for stream in self.streams]
+        self.last_originals = [None] * len(self.streams)
+        self.last_frames = [None] * len(self.streams)
+        self._next_stream = 0
+        self._start_time = None
+
+    @staticmethod
+    def _empty_stats(stream):
+        return {
+            "source": stream.source,
+            "frames_processed": 0,
+            "frames_with_dog": 0,
+            "frames_with_leash": 0,
+            "class_count": {},
+            "last_info": None
+        }
+
+    @staticmethod
+    def check_sources(sources):
+        """
+        检查视频源能否打开
+
+        Args:
+            sources: 视频文件路径或视频流地址列表
+
+        Returns:
+            无法打开的视频源列表
+        """
+        failed = []
+        for source in sources:
+            capture = cv2.VideoCapture(source)
+            if not capture.isOpened():
+                failed.append(source)
+            capture.release()
+        return failed
+
+    def start(self):
+        """启动所有视频源"""
+        self.stats = [self._empty_stats(stream) for stream in self.streams]
+        self._start_time = time.time()
+        for stream in self.streams:
+            stream.start()
+
+    def stop(self):
+        """停止所有视频源"""
+        for stream in self.streams:
+            stream.stop()
+
+    @property
+    def finished(self):
+        """所有视频源都已结束"""
+        return all(stream.exhausted for stream in self.streams)
+
+    def step(self):
+        """
+        调度一批帧并检测
+
+        Returns:
+            本批次结果列表，每项为 (stream_id, frame, result_frame, detection_info)
+        """
+        batch_ids = []
+        batch_frames = []
+        count = len(self.streams)
+        for offset in range(count):
+            if len(batch_frames) >= self.max_batch:
+                break
+            stream_id = (self._next_stream + offset) % count
+            frame = self.streams[stream_id].read()
+            if frame is not None:
+                batch_ids.append(stream_id)
+                batch_frames.append(frame)
+        self._next_stream = (self._next_stream + 1) % count
+
+        if not batch_frames:
+            return []
+
+        results = self.detector.detect_batch(batch_frames)
+        if results is None:
+            results = [None] * len(batch_frames)
+
+        outputs = []
+        for stream_id, frame, result in zip(batch_ids, batch_frames, results):
+            frame_results = [result] if result is not None else []
+            if frame_results:
+                result_frame = self.detector.draw_detections_on_frame(frame, frame_results)
+                detection_info = self.detector.get_detection_info(frame_results)
+            else:
+                result_frame = frame
+                detection_info = self.detector.get_detection_info(None)
+
+            self._update_stats(stream_id, detection_info)
+            self.last_originals[stream_id] = frame
+            self.last_frames[stream_id] = result_frame
+            outputs.append((stream_id, frame, result_frame, detection_info))
+
+        return outputs
+
+    def _update_stats(self, stream_id, detection_info):
+        stats = self.stats[stream_id]
+        stats["frames_processed"] += 1
+        stats["last_info"] = detection_info
+        if detection_info.get("dog_detected"):
+            stats["frames_with_dog"] += 1
+        if detection_info.get("leash_detected"):
+            stats["frames_with_leash"] += 1
+        for detection in detection_info["detections"]:
+            class_name = detection["class_name"]
+            stats["class_count"][class_name] = stats["class_count"].get(class_name, 0) + 1
+
+    def stream_fps(self, stream_id):
+        """视频源的平均检测帧率"""
+        if not self._start_time:
+            return 0.0
+        elapsed = time.time() - self._start_time
+        if elapsed <= 0:
+            return 0.0
+        return self.stats[stream_id]["frames_processed"] / elapsed
+
+    def grid_image(self, original=False, cell_size=(320, 240)):
+        """将各路最新的原始帧或检测结果拼接为网格图"""
+        frames = self.last_originals if original else self.last_frames
+        return make_grid(frames, cell_size=cell_size)
+
+
+def make_grid(frames, cell_size=(320, 240), cols=None):
+    """
+    将多帧拼接成网格图
+
+    Args:
+        frames: 帧列表，None 表示该路暂无画面
+        cell_size: 每格尺寸 (宽, 高)
+        cols: 列数，None 时自动取接近正方形的列数
+
+    Returns:
+        拼接后的图像
+    """
+    count = max(len(frames), 1)
+    cols = cols or math.ceil(math.sqrt(count))
+    rows = math.ceil(count / cols)
+    cell_w, cell_h = cell_size
+
+    grid = np.zeros((rows * cell_h, cols * cell_w, 3), dtype=np.uint8)
+    for index, frame in enumerate(frames):
+        row, col = divmod(index, cols)
+        y, x = row * cell_h, col * cell_w
+        if frame is not None:
+            grid[y:y + cell_h, x:x + cell_w] = cv2.resize(frame, (cell_w, cell_h))
+        cv2.putText(grid, f"#{index + 1}", (x + 8, y + 24),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+    return grid
@@ -1,9 +1,59 @@
+from collections import deque
+
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-                             QPushButton, QTextEdit, QGroupBox, QFrame, QScrollArea)
-from PyQt5.QtCore import Qt
+                             QPushButton, QListView, QGroupBox, QFrame)
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
 from PyQt5.QtGui import QFont
 
 
+class DetectionLogModel(QAbstractListModel):
+    def __init__(self, max_rows=2000, parent=None):
+        """
+        只追加、有行数上限的检测记录模型，超出上限时丢弃最早的记录
+
+        Args:
+            max_rows: 最多保留的行数
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.max_rows = max_rows
+        self.lines = deque()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.lines)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        return self.lines[index.row()]
+
+    def append_lines(self, lines):
+        """追加多行记录"""
+        lines = list(lines)[-self.max_rows:]
+        if not lines:
+            return
+
+        overflow = len(self.lines) + len(lines) - self.max_rows
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self.lines.popleft()
+            self.endRemoveRows()
+
+        start = len(self.lines)
+        self.beginInsertRows(QModelIndex(), start, start + len(lines) - 1)
+        self.lines.extend(lines)
+        self.endInsertRows()
+
+    def clear(self):
+        """清空记录"""
+        self.beginResetModel()
+        self.lines.clear()
+        self.endResetModel()
+
+
 class MainUI:
     def setupUi(self, MainWindow):
         MainWindow.setObjectName("MainWindow")
@@ -77,6 +127,38 @@ class MainUI:
         """)
         file_layout.addWidget(self.btn_select_video)
 
+        self.btn_select_multi_video = QPushButton("🎥 多路视频")
+        self.btn_select_multi_video.setMinimumHeight(45)
+        self.btn_select_multi_video.setStyleSheet("""
+            QPushButton {
+                background-color: #16a085;
+                color: white;
+                border-radius: 5px;
+                padding: 8px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #138d75;
+            }
+        """)
+        file_layout.addWidget(self.btn_select_multi_video)
+
+        self.btn_watch_folder = QPushButton("📂 监控文件夹")
+        self.btn_watch_folder.setMinimumHeight(45)
+        self.btn_watch_folder.setStyleSheet("""
+            QPushButton {
+                background-color: #e67e22;
+                color: white;
+                border-radius: 5px;
+                padding: 8px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #d35400;
+            }
+        """)
+        file_layout.addWidget(self.btn_watch_folder)
+
         left_layout.addWidget(file_group)
 
         left_layout.addSpacing(15)
@@ -215,16 +297,15 @@ class MainUI:
         result_text_group.setStyleSheet("QGroupBox { font-weight: bold; }")
         result_text_layout = QVBoxLayout(result_text_group)
 
-        # 创建滚动区域
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-
-        # 创建文本编辑框
-        self.text_result = QTextEdit()
-        self.text_result.setMinimumHeight(200)
-        self.text_result.setReadOnly(True)
-        self.text_result.setStyleSheet("""
-            QTextEdit {
+        # 创建记录列表，只追加且限制行数，记录再多刷新开销也不变
+        self.log_model = DetectionLogModel()
+        self.log_view = QListView()
+        self.log_view.setModel(self.log_model)
+        self.log_view.setMinimumHeight(200)
+        self.log_view.setUniformItemSizes(True)
+        self.log_view.setSelectionMode(QListView.NoSelection)
+        self.log_view.setStyleSheet("""
+            QListView {
                 background-color: #f8f9fa;
                 border: 1px solid #dee2e6;
                 border-radius: 5px;
@@ -234,15 +315,7 @@ class MainUI:
             }
         """)
 
-        # 设置提示文本
-        self.text_result.setPlaceholderText(
-            "检测记录将显示在这里...\n"
-            "每次检测都会添加新的记录\n"
-            "可以向上滚动查看历史记录"
-        )
-
-        scroll_area.setWidget(self.text_result)
-        result_text_layout.addWidget(scroll_area)
+        result_text_layout.addWidget(self.log_view)
 
         right_layout.addWidget(result_text_group)
 
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import time
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+MANIFEST_NAME = '.detection_manifest.json'
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """计算文件的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FolderWatcher:
+    def __init__(self, detector, folder, manifest_path=None, batch_size=16,
+                 settle_time=1.0, extensions=IMAGE_EXTENSIONS):
+        """
+        监控文件夹，增量检测新增或修改的图片
+
+        已处理的文件记录在检查点清单中（路径、修改时间、大小、哈希），
+        重启后只处理清单中没有或内容已变化的文件。
+
+        Args:
+            detector: DogLeashDetector 实例
+            folder: 监控的文件夹
+            manifest_path: 检查点清单路径，默认保存在监控文件夹中
+            batch_size: 每次轮询检测的最大图片数
+            settle_time: 文件修改后等待的秒数，避免读取尚未写完的文件
+            extensions: 需要检测的文件扩展名
+        """
+        self.detector = detector
+        self.folder = folder
+        self.manifest_path = manifest_path or os.path.join(folder, MANIFEST_NAME)
+        self.batch_size = batch_size
+        self.settle_time = settle_time
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.manifest = self.load_manifest()
+        self.pending_count = 0
+
+    def load_manifest(self):
+        """读取检查点清单，不存在或损坏时返回空清单"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if isinstance(manifest.get("files"), dict):
+                return manifest
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"检查点清单读取失败，将重新处理: {e}")
+        return {"version": 1, "files": {}}
+
+    def save_manifest(self):
+        """写入检查点清单（先写临时文件再替换，避免中断时损坏）"""
+        temp_path = self.manifest_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.manifest_path)
+
+    def scan(self):
+        """
+        扫描文件夹，找出修改时间或大小与检查点不一致的文件（只读取文件信息，不计算哈希）
+
+        Returns:
+            [(path, mtime, size)] 列表，按修改时间排序
+        """
+        candidates = []
+        now = time.time()
+
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.lower().endswith(self.extensions):
+                    continue
+
+                stat = entry.stat()
+                if now - stat.st_mtime < self.settle_time:
+                    continue
+
+                record = self.manifest["files"].get(entry.name)
+                if record and record["mtime"] == stat.st_mtime and record["size"] == stat.st_size:
+                    continue
+
+                candidates.append((entry.path, stat.st_mtime, stat.st_size))
+
+        candidates.sort(key=lambda item: item[1])
+        return candidates
+
+    def next_batch(self):
+        """
+        从扫描结果中取出下一批需要检测的文件
+
+        每次最多计算 batch_size 个文件的哈希，文件很多时分多次轮询完成，
+        避免单次轮询耗时过长。
+
+        Returns:
+            [(path, stat_info)] 列表，stat_info 包含 mtime/size/hash
+        """
+        batch = []
+        candidates = self.scan()
+        manifest_changed = False
+
+        for path, mtime, size in candidates[:self.batch_size]:
+            try:
+                digest = file_hash(path)
+            except OSError as e:
+                # 记为失败，避免无法读取的文件一直排在队首阻塞后面的文件
+                print(f"读取文件失败，文件变化前不再重试: {path}: {e}")
+                self.manifest["files"][os.path.basename(path)] = {
+                    "mtime": mtime, "size": size, "hash": None, "error": True
+                }
+                manifest_changed = True
+                continue
+
+            record = self.manifest["files"].get(os.path.basename(path))
+            if record and record["hash"] == digest:
+                # 内容未变化（例如仅被touch），只更新修改时间
+                record["mtime"] = mtime
+                record["size"] = size
+                manifest_changed = True
+                continue
+
+            batch.append((path, {"mtime": mtime, "size": size, "hash": digest}))
+
+        if manifest_changed:
+            self.save_manifest()
+
+        self.pending_count = len(candidates) - min(len(candidates), self.batch_size)
+        return batch
+
+    def poll(self):
+        """
+        检测一批新增或修改的文件并写入检查点，剩余的文件留给之后的轮询
+
+        整批检测失败时逐个重新检测，单独检测仍失败的文件记为失败，
+        在文件内容变化前不再重试。
+
+        Returns:
+            [(path, results, detection_info)] 列表，results 为单张图片的检测结果
+        """
+        processed = []
+        batch = self.next_batch()
+        if not batch:
+            return processed
+
+        results = self.detector.detect_batch([path for path, _ in batch])
+        if results is None:
+            # 整批失败，可能只是其中某个文件损坏，逐个重试
+            results = []
+            for path, _ in batch:
+                single = self.detector.detect_batch([path])
+                results.append(single[0] if single else None)
+
+        for (path, stat_info), result in zip(batch, results):
+            record = dict(stat_info)
+            if result is None:
+                record["error"] = True
+                print(f"检测失败，文件变化前不再重试: {path}")
+            else:
+                image_results = [result]
+                detection_info = self.detector.get_detection_info(image_results)
+                record["dogs"] = len(detection_info["dogs"])
+                record["unleashed"] = detection_info["unleashed_dog_count"]
+                processed.append((path, image_results, detection_info))
+            self.manifest["files"][os.path.basename(path)] = record
+
+        self.save_manifest()
+        return processed